@@ -9,26 +9,52 @@ This app provides an interface to:
 4. Serve associated PDFs when available
 """
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
+from rapidfuzz import fuzz, process
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 import re
-import base64
 from io import BytesIO
 import os
+import shutil
+import tempfile
+import logging
+from urllib.parse import quote
 
-print(f"[DEBUG] st.query_params at import: {st.query_params}")
+logger = logging.getLogger(__name__)
+logger.debug("st.query_params at import: %s", st.query_params)
 
 # ─── CONFIG ────────────────────────────────────────────────────────────────
 COLLECTION_NAME = "LPI Collection"
 METADATA_FILE = "broken_links_with_metadata.csv"
 PDF_DIR = Path("pdfs")
+# Served by Streamlit's static file serving (see .streamlit/config.toml) at app/static/pdfs/
+STATIC_PDF_DIR = Path("static") / "pdfs"
+SEARCH_COLUMNS = ['title', 'abstract', 'bibcode', 'author', 'keywords']
 
 # ─── PDF HANDLING ─────────────────────────────────────────────────────────
+def _available_pdfs() -> frozenset:
+    """
+    List the bibcodes that have a PDF in PDF_DIR.
+    The directory is read once per load_data call instead of stat-ing each file.
+    
+    Returns:
+        frozenset of bibcodes
+    """
+    try:
+        return frozenset(name[:-4] for name in os.listdir(PDF_DIR) if name.endswith('.pdf'))
+    except FileNotFoundError:
+        return frozenset()
+
 def get_pdf_url(bibcode: str) -> Optional[str]:
     """
     Generate a direct URL for a PDF file.
+    The PDF is linked into the static directory on first use, so the browser
+    fetches it over plain HTTP instead of through the Streamlit session.
     
     Args:
         bibcode: Bibcode of the paper
@@ -36,13 +62,30 @@ def get_pdf_url(bibcode: str) -> Optional[str]:
     Returns:
         URL string for the PDF if it exists, None otherwise
     """
-    pdf_path = PDF_DIR / f"{bibcode}.pdf"
-    if not pdf_path.exists():
+    if not pdf_available(bibcode):
         return None
     
-    # Create a unique URL-friendly name
-    url_name = f"{bibcode.replace('.', '_')}.pdf"
-    return f"/pdf?name={url_name}"
+    static_path = STATIC_PDF_DIR / f"{bibcode}.pdf"
+    if not static_path.exists():
+        STATIC_PDF_DIR.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(PDF_DIR / f"{bibcode}.pdf", static_path)
+        except FileExistsError:
+            # Another session rendering the same bibcode linked it first
+            pass
+        except OSError:
+            # Hard links aren't available everywhere (e.g. across filesystems).
+            # Copy to a private temp file and rename it into place, so the copy
+            # never writes over a file another session is already serving.
+            fd, tmp_path = tempfile.mkstemp(dir=STATIC_PDF_DIR, suffix=".tmp")
+            os.close(fd)
+            try:
+                shutil.copyfile(PDF_DIR / f"{bibcode}.pdf", tmp_path)
+                os.replace(tmp_path, static_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    return f"app/static/pdfs/{quote(bibcode)}.pdf"
 
 def serve_pdf(pdf_path: Path) -> bytes:
     """
@@ -57,12 +100,26 @@ def serve_pdf(pdf_path: Path) -> bytes:
     with open(pdf_path, "rb") as f:
         return f.read()
 
+@st.cache_data(max_entries=64, ttl=3600, show_spinner=False)
+def get_pdf_data(bibcode: str) -> bytes:
+    """
+    Read the PDF for a bibcode, cached so reruns don't hit the disk again.
+    
+    Args:
+        bibcode: Bibcode of the paper
+        
+    Returns:
+        PDF file contents as bytes
+    """
+    return serve_pdf(PDF_DIR / f"{bibcode}.pdf")
+
 def pdf_available(bibcode: str) -> bool:
     """
     Check if a PDF exists for the given bibcode.
+    Only called for the rows being rendered, so it checks the disk directly
+    and sees PDFs added after the metadata was loaded.
     """
-    pdf_path = PDF_DIR / f"{bibcode}.pdf"
-    return pdf_path.exists()
+    return (PDF_DIR / f"{bibcode}.pdf").exists()
 
 # ─── PAGE CONFIG ───────────────────────────────────────────────────────────
 st.set_page_config(
@@ -85,51 +142,169 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ─── DATA LOADING ─────────────────────────────────────────────────────────
+# Separator used when joining list columns, so a term can't match across two entries
+LIST_SEPARATOR = "\x1f"
+# Bump when _read_metadata_csv changes the stored columns or dtypes, so
+# sidecars written by older code are not reused
+PARQUET_SCHEMA_VERSION = 1
+ARROW_STRING = pd.ArrowDtype(pa.string())
+ARROW_STRING_LIST = pd.ArrowDtype(pa.list_(pa.string()))
+TOKEN_RE = re.compile(r'\w+')
+
+def _join_lowercase(values: List[str]) -> str:
+    """
+    Join a list of strings into a single lowercase string for substring search.
+    """
+    return LIST_SEPARATOR.join(str(v) for v in values).lower()
+
+def _read_metadata_csv(csv_path: Path) -> pd.DataFrame:
+    """
+    Parse the metadata CSV and add the derived columns used for display and search.
+    
+    Args:
+        csv_path: Path to the metadata CSV file
+        
+    Returns:
+        pd.DataFrame: Processed metadata DataFrame (without 'has_pdf')
+    """
+    # Arrow-backed string columns are compact and let .str methods run on Arrow compute kernels
+    df = pd.read_csv(csv_path, engine='pyarrow', dtype_backend='pyarrow')
+    # Columns that are empty in every row come back as null[pyarrow]; keep every column a string
+    df = df.astype(ARROW_STRING)
+    df['collection'] = COLLECTION_NAME
+    
+    # Convert string lists to actual lists
+    for col in ['author', 'keywords']:
+        if col in df.columns:
+            df[col] = df[col].fillna('').apply(lambda x: [k.strip() for k in x.split(';') if k.strip()])
+    
+    # Precompute lowercase copies of the text columns so searches don't re-lowercase them on every rerun
+    for col in ['title', 'abstract', 'bibcode', 'url']:
+        if col in df.columns:
+            df[f'_{col}_lc'] = df[col].fillna('').str.lower()
+    for col in ['author', 'keywords']:
+        if col in df.columns:
+            df[f'_{col}_lc'] = df[col].apply(_join_lowercase).astype(ARROW_STRING)
+            # Store as Arrow lists so the CSV and Parquet paths produce the same dtypes
+            df[col] = df[col].astype(ARROW_STRING_LIST)
+    return df
+
+def _write_parquet_sidecar(df: pd.DataFrame, parquet_path: Path) -> None:
+    """
+    Save the processed metadata next to the CSV.
+    The file is written to a temporary path and renamed into place, so an
+    interrupted write never leaves a truncated sidecar behind.
+    """
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=parquet_path.parent, suffix=".tmp")
+        os.close(fd)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+    except (OSError, pa.ArrowException) as e:
+        # Not fatal, the CSV will just be parsed again on the next cold start
+        logger.warning("Could not write %s: %s", parquet_path, e)
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 @st.cache_data
 def load_data() -> pd.DataFrame:
     """
     Load and prepare the metadata DataFrame.
     Adds a 'has_pdf' column for PDF availability.
     
+    The processed data is saved to a Parquet file next to the CSV and
+    reused on later cold starts as long as it is newer than the CSV and was
+    written for the current PARQUET_SCHEMA_VERSION. An unreadable sidecar
+    falls back to parsing the CSV.
+    
     Returns:
         pd.DataFrame: Processed metadata DataFrame
     """
-    if not Path(METADATA_FILE).exists():
+    csv_path = Path(METADATA_FILE)
+    if not csv_path.exists():
         st.error(f"Metadata file {METADATA_FILE} not found!")
         return pd.DataFrame()
     
-    df = pd.read_csv(METADATA_FILE)
-    df['collection'] = COLLECTION_NAME
+    parquet_path = csv_path.with_suffix(f'.v{PARQUET_SCHEMA_VERSION}.parquet')
+    df = None
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+        try:
+            df = pd.read_parquet(parquet_path, dtype_backend='pyarrow')
+        except (OSError, pa.ArrowException) as e:
+            logger.warning("Could not read %s, parsing the CSV instead: %s", parquet_path, e)
+    if df is None:
+        df = _read_metadata_csv(csv_path)
+        _write_parquet_sidecar(df, parquet_path)
     
-    # Convert string lists to actual lists
-    for col in ['author', 'keywords']:
-        if col in df.columns:
-            df[col] = df[col].fillna('').apply(lambda x: [k.strip() for k in x.split(';') if k.strip()])
-    
-    # Add has_pdf column
-    df['has_pdf'] = df['bibcode'].apply(lambda bib: (PDF_DIR / f"{bib}.pdf").exists())
+    # Add has_pdf column (not cached in Parquet, the PDF directory can change independently;
+    # the listing is refreshed whenever load_data's cache is cleared)
+    df['has_pdf'] = df['bibcode'].isin(_available_pdfs())
     return df
 
+@st.cache_resource
+def load_token_index() -> Dict[str, Set[int]]:
+    """
+    Build an inverted index over the general-search fields.
+    
+    Returns:
+        Dict mapping each lowercase token to the set of row labels containing it
+    """
+    df = load_data()
+    index: Dict[str, Set[int]] = {}
+    columns = [f'_{col}_lc' for col in SEARCH_COLUMNS if f'_{col}_lc' in df.columns]
+    for label, *texts in df[columns].itertuples(name=None):
+        for text in texts:
+            for token in TOKEN_RE.findall(text):
+                index.setdefault(token, set()).add(label)
+    return index
+
 # ─── SEARCH FUNCTIONS ────────────────────────────────────────────────────
+# Quoted values may carry a fuzzy suffix after the closing quote, e.g. author:"Smith, P"~80
+ADV_SEARCH_RE = re.compile(r'(\w+):"([^"]+)"(~\d*)?|(\w+):(\S+)')
+QUERY_TOKEN_RE = re.compile(r'\(|\)|[^\s()]+')
+BOOLEAN_OPERATORS = ('and', 'or', 'not')
+# Fuzzy author/keyword values, e.g. 'author:Smith~85' or 'author:Smith~'
+FUZZY_VALUE_RE = re.compile(r'^(.+)~(\d*)$')
+FUZZY_DEFAULT_CUTOFF = 80
+# Field filters ordered from most to least selective
+FIELD_SELECTIVITY = {
+    'bibcode': 0,
+    'year': 1,
+    'pubdate': 1,
+    'author': 2,
+    'authors': 2,
+    'title': 3,
+    'url': 3,
+    'keyword': 4,
+    'keywords': 4,
+    'collection': 5,
+    'has_pdf': 5,
+    'no_pdf': 5,
+    'abstract': 6,
+}
+
 def parse_advanced_search(search_term: str) -> (dict, str):
     """
     Parse advanced search syntax like 'year:2000 author:Smith title:Mars'.
     Returns a dict of field filters and a general search string.
     """
-    pattern = re.compile(r'(\w+):"([^"]+)"|(\w+):(\S+)')
     filters = {}
-    rest = search_term
-    for match in pattern.finditer(search_term):
-        field = match.group(1) or match.group(3)
-        value = match.group(2) or match.group(4)
+    for match in ADV_SEARCH_RE.finditer(search_term):
+        if match.group(1):
+            field, value = match.group(1), match.group(2) + (match.group(3) or '')
+        else:
+            field, value = match.group(4), match.group(5)
         filters[field.lower()] = value
-        rest = rest.replace(match.group(0), '')
-    rest = rest.strip()
+    rest = ADV_SEARCH_RE.sub('', search_term).strip()
     return filters, rest
 
-def filter_dataframe_advanced(df: pd.DataFrame, search_term: str) -> pd.DataFrame:
+def filter_dataframe_advanced(df: pd.DataFrame, search_term: str,
+                              token_index: Optional[Dict[str, Set[int]]] = None) -> pd.DataFrame:
     """
     Filter DataFrame based on advanced search syntax and general search, supporting boolean logic (AND, OR, NOT) in general search.
+    If a token index (see load_token_index) is given, general search terms are looked up there instead of scanning every row.
     """
     if not search_term:
         return df
@@ -137,85 +312,322 @@ def filter_dataframe_advanced(df: pd.DataFrame, search_term: str) -> pd.DataFram
     # Split search term into field-specific filters and general search
     filters, general = parse_advanced_search(search_term)
     
-    # Start with all records
-    mask = pd.Series(True, index=df.index)
-    
-    # Apply field-specific filters
-    for field, value in filters.items():
-        if field in ['author', 'authors'] and 'author' in df.columns:
-            mask &= df['author'].apply(lambda x: any(value.lower() in str(a).lower() for a in x))
-        elif field in ['keyword', 'keywords'] and 'keywords' in df.columns:
-            mask &= df['keywords'].apply(lambda x: any(value.lower() in str(k).lower() for k in x))
-        elif field in ['title', 'abstract', 'collection', 'bibcode'] and field in df.columns:
-            mask &= field_filter(df[field], value)
-        elif field == 'url' and 'url' in df.columns:
-            mask &= field_filter(df['url'], value)
-        elif field in ['year', 'pubdate'] and 'pubdate' in df.columns:
-            mask &= df['pubdate'].str.contains(value, na=False)
-        elif field == 'has_pdf' and 'has_pdf' in df.columns:
-            if value == '*' or value == '':
-                mask &= df['has_pdf']
-            else:
-                mask &= df['has_pdf'] == (value.lower() in ['true', 'yes', '1'])
-        elif field == 'no_pdf' and 'has_pdf' in df.columns:
-            if value == '*' or value == '':
-                mask &= ~df['has_pdf']
-            else:
-                mask &= df['has_pdf'] == (value.lower() not in ['true', 'yes', '1'])
+    # Apply field-specific filters, most selective first, so each filter only
+    # scans the rows that survived the previous ones
+    idx = df.index
+    for field, value in sorted(filters.items(), key=lambda kv: _selectivity_hint(kv[0])):
+        if len(idx) == 0:
+            break
+        sub = df if len(idx) == len(df) else df.loc[idx]
+        predicate = _field_predicate(sub, field, value)
+        if predicate is not None:
+            idx = idx[predicate]
+    mask = df.index.isin(idx)
     
     # Only apply general search if there is no field-specific filter
     if general and not filters:
-        general = general.lower()
-        # Split on OR first
-        or_parts = [part.strip() for part in re.split(r'\s+or\s+', general)]
-        or_masks = []
-        for or_part in or_parts:
-            # Split on AND
-            and_parts = [p.strip() for p in re.split(r'\s+and\s+', or_part)]
-            and_mask = pd.Series(True, index=df.index)
-            for and_part in and_parts:
-                # Handle NOT and parentheses for nested logic
-                part = and_part.strip()
-                if part.startswith('not '):
-                    sub_term = part[4:].strip()
-                    and_mask &= ~_search_any_field(df, sub_term)
-                elif part.startswith('(') and part.endswith(')'):
-                    # Recursively handle nested boolean logic
-                    nested = part[1:-1].strip()
-                    nested_mask = filter_dataframe_advanced(df, nested).index
-                    and_mask &= df.index.isin(nested_mask)
-                else:
-                    and_mask &= _search_any_field(df, part)
-            or_masks.append(and_mask)
-        # Combine all OR masks
-        if or_masks:
-            general_mask = or_masks[0]
-            for m in or_masks[1:]:
-                general_mask |= m
-            mask &= general_mask
+        tree = _parse_boolean(_tokenize_query(general.lower()))
+        if tree is not None:
+            mask &= _eval_mask(df, tree, token_index)
     
     return df[mask]
 
-def _search_any_field(df: pd.DataFrame, term: str) -> pd.Series:
+def _tokenize_query(query: str) -> List[Tuple[str, str]]:
+    """
+    Split a general search query into (kind, value) tokens in a single pass.
+    
+    Kinds are 'op' (and/or/not), 'lparen', 'rparen' and 'term'. Consecutive
+    words that aren't operators are merged into one phrase term, keeping the
+    original spacing between them.
+    """
+    tokens = []
+    phrase_start = phrase_end = None
+    for match in QUERY_TOKEN_RE.finditer(query):
+        word = match.group(0)
+        if word not in ('(', ')') and word not in BOOLEAN_OPERATORS:
+            if phrase_start is None:
+                phrase_start = match.start()
+            phrase_end = match.end()
+            continue
+        if phrase_start is not None:
+            tokens.append(('term', query[phrase_start:phrase_end]))
+            phrase_start = None
+        if word == '(':
+            tokens.append(('lparen', word))
+        elif word == ')':
+            tokens.append(('rparen', word))
+        else:
+            tokens.append(('op', word))
+    if phrase_start is not None:
+        tokens.append(('term', query[phrase_start:phrase_end]))
+    return tokens
+
+def _parse_boolean(tokens: List[Tuple[str, str]]) -> Optional[tuple]:
+    """
+    Parse query tokens into a boolean expression tree.
+    
+    NOT binds tighter than AND, which binds tighter than OR; a missing
+    operator between two operands means AND. Nodes are ('term', text),
+    ('not', child), ('and', [children]) and ('or', [children]).
+    Unbalanced parentheses and dangling operators are ignored.
+    
+    Returns:
+        Root node, or None if the query has no terms
+    """
+    pos = 0
+    
+    def peek() -> Tuple[Optional[str], Optional[str]]:
+        return tokens[pos] if pos < len(tokens) else (None, None)
+    
+    def parse_or() -> Optional[tuple]:
+        nonlocal pos
+        children = []
+        while True:
+            node = parse_and()
+            if node is not None:
+                children.append(node)
+            if peek() != ('op', 'or'):
+                break
+            pos += 1
+        return _combine('or', children)
+    
+    def parse_and() -> Optional[tuple]:
+        nonlocal pos
+        children = []
+        while True:
+            kind, value = peek()
+            if kind is None or kind == 'rparen' or (kind, value) == ('op', 'or'):
+                break
+            if (kind, value) == ('op', 'and'):
+                pos += 1
+                continue
+            node = parse_unary()
+            if node is not None:
+                children.append(node)
+        return _combine('and', children)
+    
+    def parse_unary() -> Optional[tuple]:
+        nonlocal pos
+        kind, value = peek()
+        pos += 1
+        if (kind, value) == ('op', 'not'):
+            child = parse_unary()
+            return ('not', child) if child is not None else None
+        if kind == 'lparen':
+            node = parse_or()
+            if peek()[0] == 'rparen':
+                pos += 1
+            return node
+        if kind == 'term':
+            return ('term', value)
+        return None
+    
+    root = None
+    while pos < len(tokens):
+        # A stray closing parenthesis ends parse_or early; skip it and keep going
+        node = parse_or()
+        if node is not None:
+            root = node if root is None else ('and', [root, node])
+        if peek()[0] == 'rparen':
+            pos += 1
+    return root
+
+def _combine(kind: str, children: List[tuple]) -> Optional[tuple]:
+    """
+    Build an 'and'/'or' node, collapsing it when it has fewer than two children.
+    """
+    if not children:
+        return None
+    if len(children) == 1:
+        return children[0]
+    return (kind, children)
+
+def _eval_mask(df: pd.DataFrame, node: tuple,
+               token_index: Optional[Dict[str, Set[int]]] = None) -> np.ndarray:
+    """
+    Evaluate a boolean expression tree from _parse_boolean against the DataFrame.
+    Returns a boolean mask.
+    """
+    kind = node[0]
+    if kind == 'term':
+        return _search_any_field(df, node[1], token_index)
+    if kind == 'not':
+        return ~_eval_mask(df, node[1], token_index)
+    masks = [_eval_mask(df, child, token_index) for child in node[1]]
+    if kind == 'and':
+        return np.logical_and.reduce(masks)
+    return np.logical_or.reduce(masks)
+
+def _selectivity_hint(field: str) -> int:
+    """
+    Rough rank of how selective a field filter is; lower values run first.
+    """
+    return FIELD_SELECTIVITY.get(field, len(FIELD_SELECTIVITY))
+
+def _field_predicate(df: pd.DataFrame, field: str, value: str) -> Optional[np.ndarray]:
+    """
+    Build the boolean mask for a single field-specific filter.
+    Returns None for fields that can't be filtered on.
+    """
+    if field in ['author', 'authors'] and 'author' in df.columns:
+        return _list_column_filter(df, 'author', value)
+    elif field in ['keyword', 'keywords'] and 'keywords' in df.columns:
+        return _list_column_filter(df, 'keywords', value)
+    elif field in ['title', 'abstract', 'collection', 'bibcode'] and field in df.columns:
+        return field_filter(_lowercase_column(df, field), value)
+    elif field == 'url' and 'url' in df.columns:
+        return field_filter(_lowercase_column(df, 'url'), value)
+    elif field in ['year', 'pubdate'] and 'pubdate' in df.columns:
+        return field_filter(_lowercase_column(df, 'pubdate'), value)
+    elif field == 'has_pdf' and 'has_pdf' in df.columns:
+        has_pdf = df['has_pdf'].to_numpy(dtype=bool)
+        if value == '*' or value == '':
+            return has_pdf
+        return has_pdf == (value.lower() in ['true', 'yes', '1'])
+    elif field == 'no_pdf' and 'has_pdf' in df.columns:
+        has_pdf = df['has_pdf'].to_numpy(dtype=bool)
+        if value == '*' or value == '':
+            return ~has_pdf
+        return has_pdf == (value.lower() not in ['true', 'yes', '1'])
+    return None
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _filter_cached(search_term: str) -> np.ndarray:
+    """
+    Filter the loaded metadata, memoized on the search term so reruns that only
+    change pagination don't run the filters again.
+    
+    Returns:
+        Index labels of the matching rows
+    """
+    df = load_data()
+    return filter_dataframe_advanced(df, search_term, load_token_index()).index.to_numpy()
+
+def _search_any_field(df: pd.DataFrame, term: str,
+                      token_index: Optional[Dict[str, Set[int]]] = None) -> np.ndarray:
     """
     Search for a term in all relevant fields (title, abstract, bibcode, author, keywords).
     Returns a boolean mask.
     """
     term = term.strip().lower()
-    mask = pd.Series(False, index=df.index)
-    text_columns = ['title', 'abstract', 'bibcode']
-    for col in text_columns:
+    if token_index is not None:
+        labels = _lookup_token_index(token_index, term)
+        if labels is not None:
+            return df.index.isin(labels)
+    mask = np.zeros(len(df), dtype=bool)
+    for col in SEARCH_COLUMNS:
         if col in df.columns:
-            mask |= df[col].str.lower().fillna('').str.contains(term, na=False)
-    list_columns = ['author', 'keywords']
-    for col in list_columns:
-        if col in df.columns:
-            mask |= df[col].apply(lambda x: any(term in str(k).lower() for k in x))
+            mask |= _contains(_lowercase_column(df, col), term)
     return mask
 
-def field_filter(series: pd.Series, value: str) -> pd.Series:
+def _lookup_token_index(token_index: Dict[str, Set[int]], term: str) -> Optional[Set[int]]:
+    """
+    Find the row labels whose searchable text contains the term.
+    
+    A single-word term can only occur inside one token, so scanning the
+    index vocabulary gives the same result as scanning every row.
+    
+    Returns:
+        Set of row labels, or None if the term spans several tokens
+    """
+    if not TOKEN_RE.fullmatch(term):
+        return None
+    labels: Set[int] = set()
+    for token, postings in token_index.items():
+        if term in token:
+            labels |= postings
+    return labels
+
+def _list_column_filter(df: pd.DataFrame, col: str, value: str) -> np.ndarray:
+    """
+    Filter a list column (author, keywords) by substring, or fuzzily when the
+    value ends in '~' with an optional score cutoff (e.g. 'Smith~85').
+    Returns a boolean mask.
+    """
+    fuzzy = FUZZY_VALUE_RE.match(value)
+    if not fuzzy:
+        return _list_column_contains(df, col, value)
+    term = fuzzy.group(1).lower()
+    cutoff = int(fuzzy.group(2)) if fuzzy.group(2) else FUZZY_DEFAULT_CUTOFF
+    # Score each entry on its own so an alignment can't straddle two authors,
+    # all in one batched call; scores below the cutoff come back as 0
+    values = _list_values(df, col)
+    entries = pc.fill_null(pc.utf8_lower(pc.list_flatten(values)), '').to_pylist()
+    scores = process.cdist([term], entries, scorer=fuzz.partial_ratio, score_cutoff=cutoff)
+    return _rows_with_hits(values, scores[0] >= cutoff)
+
+def _list_column_contains(df: pd.DataFrame, col: str, term: str) -> np.ndarray:
+    """
+    Check which rows of a list column (author, keywords) have an entry containing the term.
+    
+    For Arrow list columns, all entries are matched in one pass over the
+    flattened values and the hits are mapped back to their rows.
+    Returns a boolean mask.
+    """
+    if not isinstance(df[col].dtype, pd.ArrowDtype):
+        return _contains(_lowercase_column(df, col), term.lower())
+    values = _arrow_array(df[col])
+    hits = pc.fill_null(pc.match_substring(pc.list_flatten(values), term, ignore_case=True), False)
+    return _rows_with_hits(values, hits.to_numpy(zero_copy_only=False))
+
+def _list_values(df: pd.DataFrame, col: str) -> pa.Array:
+    """
+    Return a list column (author, keywords) as an Arrow list array.
+    """
+    if isinstance(df[col].dtype, pd.ArrowDtype):
+        return _arrow_array(df[col])
+    return pa.array(_lowercase_column(df, col).str.split(LIST_SEPARATOR), type=pa.list_(pa.string()))
+
+def _rows_with_hits(values: pa.Array, hits: np.ndarray) -> np.ndarray:
+    """
+    Map a boolean mask over the flattened entries of a list array back to its
+    rows: a row is True if any of its entries is.
+    """
+    lengths = pc.fill_null(pc.list_value_length(values), 0).to_numpy()
+    # Count hits per row from the running total at each row's start and end offset
+    hit_totals = np.concatenate(([0], np.cumsum(hits)))
+    ends = np.cumsum(lengths)
+    return hit_totals[ends] > hit_totals[ends - lengths]
+
+def _arrow_array(series: pd.Series) -> pa.Array:
+    """
+    Return the Arrow data behind an Arrow-backed series as a single contiguous array.
+    """
+    values = pa.array(series.array)
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    return values
+
+def _contains(series: pd.Series, pattern: str, regex: bool = False, ignore_case: bool = False) -> np.ndarray:
+    """
+    Substring (or regex) match over a string column.
+    Arrow-backed columns are matched directly with Arrow compute kernels,
+    skipping the pandas .str dispatch.
+    Returns a boolean mask.
+    """
+    if isinstance(series.dtype, pd.ArrowDtype):
+        match = pc.match_substring_regex if regex else pc.match_substring
+        hits = pc.fill_null(match(_arrow_array(series), pattern, ignore_case=ignore_case), False)
+        return hits.to_numpy(zero_copy_only=False)
+    return series.str.contains(pattern, case=not ignore_case, na=False, regex=regex).to_numpy(dtype=bool)
+
+def _lowercase_column(df: pd.DataFrame, col: str) -> pd.Series:
+    """
+    Return the lowercase version of a text column, using the copy precomputed
+    in load_data when available. List columns (author, keywords) are joined
+    with LIST_SEPARATOR.
+    """
+    lc_col = f'_{col}_lc'
+    if lc_col in df.columns:
+        return df[lc_col]
+    if col in ['author', 'keywords']:
+        return df[col].apply(_join_lowercase)
+    return df[col].fillna('').astype(str).str.lower()
+
+def field_filter(series: pd.Series, value: str) -> np.ndarray:
     """
     Generalized field filter supporting NOT/! and * wildcards.
+    Expects a lowercase series (see _lowercase_column).
     Returns a boolean mask.
     """
     val = value.lower().strip()
@@ -227,37 +639,46 @@ def field_filter(series: pd.Series, value: str) -> pd.Series:
         is_not = True
         val = val[1:].strip()
     
-    # Convert * to regex pattern
-    pattern = re.escape(val).replace('\\*', '.*')
-    
-    # Create mask for matching values
-    match_mask = series.str.lower().fillna('').str.contains(pattern, na=False, regex=True)
+    # Only fall back to regex matching when a * wildcard is present
+    if '*' in val:
+        pattern = re.escape(val).replace('\\*', '.*')
+        match_mask = _contains(series, pattern, regex=True)
+    else:
+        match_mask = _contains(series, val)
     
     # For NOT conditions, return True for:
     # 1. Records that don't match the pattern
     # 2. Records with NaN values
     # 3. Records with empty strings
     if is_not:
-        return ~match_mask | series.isna() | (series.str.strip().eq(''))
+        return ~match_mask | series.fillna('').str.strip().eq('').to_numpy(dtype=bool)
     else:
         return match_mask
 
 def display_pdf_link(bibcode: str) -> None:
     """
-    Display a download button for the PDF matching the bibcode.
-    """
-    pdf_path = PDF_DIR / f"{bibcode}.pdf"
-    if pdf_path.exists():
-        with open(pdf_path, "rb") as f:
-            pdf_bytes = f.read()
-        st.download_button(
-            label="Download PDF",
-            data=pdf_bytes,
-            file_name=f"{bibcode}.pdf",
-            mime="application/pdf"
-        )
-    else:
+    Display a link to open the PDF matching the bibcode, plus a download button.
+    The PDF is only read into the session once the user asks to download it,
+    rather than on every rerun for every displayed record.
+    """
+    pdf_url = get_pdf_url(bibcode)
+    if pdf_url is None:
         st.markdown("PDF not available")
+        return
+    
+    st.link_button("Open PDF", pdf_url)
+    prepared = st.session_state.setdefault('prepared_pdfs', set())
+    if bibcode not in prepared:
+        if not st.button("Prepare PDF", key=f"prepare_pdf_{bibcode}"):
+            return
+        prepared.add(bibcode)
+    st.download_button(
+        label="Download PDF",
+        data=get_pdf_data(bibcode),
+        file_name=f"{bibcode}.pdf",
+        mime="application/pdf",
+        key=f"download_pdf_{bibcode}"
+    )
 
 # ─── MAIN APP ───────────────────────────────────────────────────────────
 def main():
@@ -274,6 +695,7 @@ def main():
         - Use `*` as a wildcard (e.g. `url:leag*` matches any URL containing 'leag')
         - Use `!` for negation (e.g. `url:!leag*` to find URLs not containing 'leag')
         - Use `AND`, `OR`, and parentheses for complex/nested boolean logic (e.g. `!keyword AND (keyword OR keyword)`)
+        - Use `~` after an author or keyword for fuzzy matching, with an optional score cutoff (e.g. `author:Smyth~` uses the default cutoff of 80, `author:Smyth~70` is looser)
         - Searchable fields include: year, author, title, abstract, keywords, collection, bibcode, pubdate, has_pdf, no_pdf, url
         """
     )
@@ -303,54 +725,62 @@ def main():
         "**Examples:** `year:2000 author:Smith title:Mars` &nbsp;&nbsp;|&nbsp;&nbsp; `Mars exploration` (unfielded search)"
     )
     
-    # Search box (no help tooltip, no ? icon)
-    search_term = st.text_input(
-        "Search",
-        key="search"
-    )
+    # Search box (no help tooltip, no ? icon); inside a form so filtering
+    # only runs when the search is submitted, not on every keystroke
+    with st.form("search_form", clear_on_submit=False):
+        search_term = st.text_input(
+            "Search",
+            key="search"
+        )
+        submitted = st.form_submit_button("Search")
     
-    # Filter data
-    filtered_df = filter_dataframe_advanced(df, search_term)
+    # Filter data, reusing the last results on reruns triggered by pagination
+    if submitted or 'last_filtered_idx' not in st.session_state:
+        st.session_state['last_filtered_idx'] = _filter_cached(search_term)
+    filtered_idx = st.session_state['last_filtered_idx']
     
     # Pagination controls
     page_size = st.selectbox("Results per page", [10, 25, 50, 100], index=0)
-    total_results = len(filtered_df)
+    total_results = len(filtered_idx)
     total_pages = max(1, (total_results + page_size - 1) // page_size)
     page_num = st.number_input(
         "Page", min_value=1, max_value=total_pages, value=1, step=1, format="%d"
     )
     start_idx = (page_num - 1) * page_size
     end_idx = min(start_idx + page_size, total_results)
-    page_df = filtered_df.iloc[start_idx:end_idx]
+    # Only materialize the visible rows, as a standalone copy so nothing past
+    # this point holds on to the full frame
+    page_df = df.loc[filtered_idx[start_idx:end_idx]].reset_index(drop=True).copy()
     
     st.markdown(f"### Showing results {start_idx+1}–{end_idx} of {total_results}")
     
     # Create expandable sections for each result on the current page
-    for idx, row in page_df.iterrows():
+    for row in page_df.itertuples(index=False):
         # Collapsed: title, authors, pubdate
-        authors = ", ".join(row['author']) if row['author'] else "No authors available"
-        pubdate = row['pubdate'] if pd.notna(row['pubdate']) else "No date available"
-        pdf_status = "✅" if row['has_pdf'] else "❌"
-        label = f"{pdf_status} {row['title']} | {authors} | {pubdate}"
+        authors = ", ".join(row.author) if row.author else "No authors available"
+        pubdate = row.pubdate if pd.notna(row.pubdate) else "No date available"
+        pdf_status = "✅" if row.has_pdf else "❌"
+        label = f"{pdf_status} {row.title} | {authors} | {pubdate}"
         with st.expander(label):
             col1, col2 = st.columns([2, 1])
             with col1:
-                st.markdown("#### Abstract")
-                st.markdown(row['abstract'] if pd.notna(row['abstract']) else "No abstract available")
-                st.markdown("#### Authors")
-                st.markdown(authors)
-                st.markdown("#### Keywords")
-                st.markdown(", ".join(row['keywords']) if row['keywords'] else "No keywords available")
+                abstract = row.abstract if pd.notna(row.abstract) else "No abstract available"
+                keywords = ", ".join(row.keywords) if row.keywords else "No keywords available"
+                # One markdown element per column instead of one per heading/value
+                st.markdown(
+                    f"#### Abstract\n\n{abstract}\n\n"
+                    f"#### Authors\n\n{authors}\n\n"
+                    f"#### Keywords\n\n{keywords}"
+                )
             with col2:
-                st.markdown("#### Publication Date")
-                st.markdown(pubdate)
-                st.markdown("#### Collection")
-                st.markdown(row['collection'])
-                st.markdown("#### Bibcode")
-                st.markdown(f"[{row['bibcode']}](https://ui.adsabs.harvard.edu/abs/{row['bibcode']})")
-                display_pdf_link(row['bibcode'])
+                st.markdown(
+                    f"#### Publication Date\n\n{pubdate}\n\n"
+                    f"#### Collection\n\n{row.collection}\n\n"
+                    f"#### Bibcode\n\n[{row.bibcode}](https://ui.adsabs.harvard.edu/abs/{row.bibcode})"
+                )
+                display_pdf_link(row.bibcode)
                 st.markdown(f"**{pdf_status}**")
-                print(f"[DEBUG] Displaying record with bibcode: {row['bibcode']}")
+                logger.debug("Displaying record with bibcode: %s", row.bibcode)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
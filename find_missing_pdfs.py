@@ -3,11 +3,31 @@
 Script to identify records that don't have associated PDFs and output their metadata.
 """
 
+import os
 import pandas as pd
-from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Set
 import csv
 
+# Columns written to the missing PDFs report
+REPORT_COLUMNS = ['bibcode', 'title', 'author', 'pubdate', 'url', 'abstract', 'keywords']
+# Rows read from the metadata file at a time when streaming the report
+CHUNK_SIZE = 50_000
+
+def list_pdf_bibcodes(pdf_dir: str) -> Set[str]:
+    """
+    List the bibcodes that have a PDF in a directory.
+    
+    Args:
+        pdf_dir: Directory containing PDF files
+        
+    Returns:
+        Set of bibcodes (file names without the .pdf extension)
+    """
+    if not os.path.isdir(pdf_dir):
+        return set()
+    with os.scandir(pdf_dir) as entries:
+        return {e.name[:-4] for e in entries if e.name.endswith('.pdf')}
+
 def find_missing_pdfs(metadata_file: str = "broken_links_with_metadata.csv", 
                      pdf_dir: str = "pdfs") -> pd.DataFrame:
     """
@@ -20,15 +40,16 @@ def find_missing_pdfs(metadata_file: str = "broken_links_with_metadata.csv",
     Returns:
         DataFrame containing records without PDFs
     """
-    # Load metadata
-    df = pd.read_csv(metadata_file)
+    # Load only the columns that go into the report
+    df = pd.read_csv(metadata_file, usecols=REPORT_COLUMNS,
+                     dtype={'bibcode': 'string', 'pubdate': 'category'})
     
-    # Check which records have PDFs
-    pdf_path = Path(pdf_dir)
-    df['has_pdf'] = df['bibcode'].apply(lambda bib: (pdf_path / f"{bib}.pdf").exists())
+    # Check which records have PDFs, reading the directory once instead of
+    # stat-ing one file per record
+    has_pdf = df['bibcode'].isin(list_pdf_bibcodes(pdf_dir))
     
     # Filter for records without PDFs
-    missing_pdfs = df[~df['has_pdf']]
+    missing_pdfs = df[~has_pdf]
     
     return missing_pdfs
 
@@ -40,23 +61,46 @@ def save_missing_pdfs_report(df: pd.DataFrame, output_file: str = "missing_pdfs_
         df: DataFrame containing records without PDFs
         output_file: Path to save the report
     """
-    # Select relevant columns
-    columns = ['bibcode', 'title', 'author', 'pubdate', 'url', 'abstract', 'keywords']
-    df = df[columns]
-    
     # Save to CSV
-    df.to_csv(output_file, index=False)
+    df.to_csv(output_file, columns=REPORT_COLUMNS, index=False)
     print(f"Report saved to {output_file}")
     print(f"Total records without PDFs: {len(df)}")
 
+def stream_missing_pdfs_report(metadata_file: str = "broken_links_with_metadata.csv",
+                               pdf_dir: str = "pdfs",
+                               output_file: str = "missing_pdfs_report.csv",
+                               chunksize: int = CHUNK_SIZE) -> int:
+    """
+    Find records without PDFs and write them to the report chunk by chunk,
+    so memory use is bounded by the chunk size rather than the metadata file.
+    
+    Args:
+        metadata_file: Path to the metadata CSV file
+        pdf_dir: Directory containing PDF files
+        output_file: Path to save the report
+        chunksize: Number of metadata rows to process at a time
+        
+    Returns:
+        Number of records without PDFs
+    """
+    existing = list_pdf_bibcodes(pdf_dir)
+    total = 0
+    with open(output_file, 'w', newline='', encoding='utf-8') as out:
+        chunks = pd.read_csv(metadata_file, usecols=REPORT_COLUMNS, chunksize=chunksize,
+                             dtype={'bibcode': 'string', 'pubdate': 'category'})
+        for i, chunk in enumerate(chunks):
+            missing = chunk[~chunk['bibcode'].isin(existing)]
+            missing.to_csv(out, columns=REPORT_COLUMNS, header=(i == 0), index=False)
+            total += len(missing)
+    print(f"Report saved to {output_file}")
+    print(f"Total records without PDFs: {total}")
+    return total
+
 def main() -> None:
     """Main function to run the script."""
     try:
-        # Find records without PDFs
-        missing_pdfs = find_missing_pdfs()
-        
-        # Save report
-        save_missing_pdfs_report(missing_pdfs)
+        # Find records without PDFs and save the report
+        stream_missing_pdfs_report()
         
     except Exception as e:
         print(f"Error: {str(e)}")
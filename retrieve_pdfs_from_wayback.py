@@ -5,9 +5,13 @@ Script to retrieve PDFs for broken links using the Internet Archive Wayback Mach
 
 import os
 import csv
-import requests
+import tempfile
+import asyncio
+import aiohttp
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Set, Tuple
+from itertools import chain, zip_longest
+from urllib.parse import urlparse
 import time
 
 WAYBACK_API = "http://archive.org/wayback/available"
@@ -17,217 +21,353 @@ PDF_DIR = "retrieved_pdfs"
 CSV_FILE = "broken_links_with_metadata.csv"
 LOG_FILE = "wayback_retrieval_log.csv"
 NOT_FOUND_FILE = "not_found_pdfs.csv"
+USER_AGENT = "ads-broken-links/1.0"
+# Rows processed at once, and open connections overall / per host
+# (the per-host cap keeps web.archive.org and archive.org within their rate limits)
+CONCURRENCY = 64
+PER_HOST_LIMIT = 8
+# Retries for connection errors and transient gateway errors, with exponential backoff
+RETRY_STATUSES = (502, 503, 504)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+PDF_MAGIC = b"%PDF-"
+MAX_SNAPSHOTS = 10
+LOG_BATCH_SIZE = 256
+LOOKUP_CACHE_SIZE = 8192
 
 os.makedirs(PDF_DIR, exist_ok=True)
 
-def get_all_wayback_snapshots(original_url: str) -> List[str]:
+def cached_lookup(func):
     """
-    Get all snapshot URLs for a given URL from the Wayback Machine (oldest to newest).
+    Cache an async lookup taking (session, query) by query, so repeated
+    queries across rows are only sent once. The in-flight task is cached,
+    so concurrent callers with the same query share one request.
     """
-    params = {
-        "url": original_url,
-        "output": "json",
-        "fl": "timestamp,original",
-        "filter": "statuscode:200",
-        "collapse": "digest"
-    }
-    try:
-        resp = requests.get(CDX_API, params=params, timeout=15)
+    cache = {}
+
+    async def wrapper(session: aiohttp.ClientSession, query: str):
+        if query not in cache:
+            if len(cache) >= LOOKUP_CACHE_SIZE:
+                cache.pop(next(iter(cache)))
+            cache[query] = asyncio.ensure_future(func(session, query))
+        return await cache[query]
+
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+async def get_with_retry(session: aiohttp.ClientSession, url: str, **kwargs) -> aiohttp.ClientResponse:
+    """
+    GET a URL, retrying connection errors and transient gateway errors with
+    exponential backoff. The caller must release the returned response.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        last_attempt = attempt == MAX_RETRIES
+        try:
+            resp = await session.get(url, **kwargs)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if last_attempt:
+                raise
+        else:
+            if resp.status not in RETRY_STATUSES or last_attempt:
+                return resp
+            resp.release()
+        await asyncio.sleep(BACKOFF_FACTOR * 2 ** attempt)
+
+async def get_json(session: aiohttp.ClientSession, url: str, params: List[Tuple[str, str]],
+                   timeout: float) -> object:
+    """
+    GET a JSON document, retrying transient errors.
+    """
+    timeout = aiohttp.ClientTimeout(total=timeout)
+    async with await get_with_retry(session, url, params=params, timeout=timeout) as resp:
         resp.raise_for_status()
-        data = resp.json()
+        # The CDX API doesn't always label its JSON as application/json
+        return await resp.json(content_type=None)
+
+@cached_lookup
+async def get_all_wayback_snapshots(session: aiohttp.ClientSession, original_url: str) -> Tuple[str, ...]:
+    """
+    Get snapshot URLs for a given URL from the Wayback Machine (oldest to newest).
+    Cached, so URLs repeated across rows are only looked up once.
+    Only the newest MAX_SNAPSHOTS snapshots archived as PDFs are returned; the
+    CDX server does the filtering so non-PDF captures are never downloaded.
+    """
+    params = [
+        ("url", original_url),
+        ("output", "json"),
+        ("fl", "timestamp,original"),
+        ("filter", "statuscode:200"),
+        # CDX filters are regexes over the whole field; match any PDF mimetype
+        # variant (e.g. application/x-pdf), as download_pdf does
+        ("filter", "mimetype:.*pdf.*"),
+        ("collapse", "digest"),
+        ("limit", str(-MAX_SNAPSHOTS)),
+        ("fastLatest", "true")
+    ]
+    try:
+        data = await get_json(session, CDX_API, params, timeout=15)
         if len(data) > 1:
             # Skip header row
-            snapshots = [
+            snapshots = tuple(
                 f"http://web.archive.org/web/{row[0]}/{row[1]}"
                 for row in data[1:]
-            ]
+            )
             return snapshots
     except Exception as e:
         print(f"Error querying CDX for {original_url}: {e}")
-    return []
+    return ()
 
-def download_pdf(url: str, out_path: Path) -> (bool, str):
+async def download_pdf(session: aiohttp.ClientSession, url: str, out_path: Path) -> (bool, str):
     """
     Download a PDF from the given URL to the specified path. Returns (success, reason).
+    The file is written to a temporary file of its own and only renamed into
+    place once complete, so an interrupted download never looks like a finished
+    PDF and concurrent downloads never share a partial file.
+    Responses that don't start with the PDF magic bytes are rejected unread.
     """
+    tmp_path = None
     try:
-        resp = requests.get(url, timeout=30, stream=True)
-        resp.raise_for_status()
-        content_type = resp.headers.get("Content-Type", "")
-        if "pdf" not in content_type.lower():
-            return False, f"Content-Type not PDF: {content_type}"
-        with open(out_path, "wb") as f:
-            for chunk in resp.iter_content(chunk_size=8192):
-                f.write(chunk)
+        timeout = aiohttp.ClientTimeout(sock_connect=30, sock_read=30)
+        async with await get_with_retry(session, url, timeout=timeout) as resp:
+            resp.raise_for_status()
+            content_type = resp.headers.get("Content-Type", "")
+            if "pdf" not in content_type.lower():
+                return False, f"Content-Type not PDF: {content_type}"
+            # Archives sometimes serve HTML error pages labelled as PDF
+            first = await resp.content.readexactly(len(PDF_MAGIC))
+            if not first.startswith(PDF_MAGIC):
+                return False, "Not a PDF (magic mismatch)"
+            fd, tmp_path = tempfile.mkstemp(dir=PDF_DIR, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(first)
+                async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        os.replace(tmp_path, out_path)
         return True, "Downloaded"
     except Exception as e:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False, f"Error: {e}"
 
-def search_internet_archive(query: str) -> Optional[str]:
+@cached_lookup
+async def search_internet_archive(session: aiohttp.ClientSession, query: str) -> Tuple[str, ...]:
     """
     Search the Internet Archive for a PDF by query (bibcode or title).
-    Returns the first PDF URL found, or None.
+    Returns candidate PDF URLs, best match first. They aren't probed here;
+    download_pdf fails cleanly on the ones that don't exist.
+    Cached, so repeated queries are only sent once.
     """
-    params = {
-        "q": query,
-        "fl[]": ["identifier", "title", "mediatype"],
-        "output": "json",
-        "rows": 10
-    }
+    pdf_urls = []
+    params = [
+        ("q", query),
+        ("fl[]", "identifier"),
+        ("fl[]", "title"),
+        ("fl[]", "mediatype"),
+        ("output", "json"),
+        ("rows", "10")
+    ]
     try:
-        resp = requests.get(IA_SEARCH_API, params=params, timeout=20)
-        resp.raise_for_status()
-        data = resp.json()
+        data = await get_json(session, IA_SEARCH_API, params, timeout=20)
         for doc in data.get("response", {}).get("docs", []):
             if doc.get("mediatype") == "texts":
                 identifier = doc.get("identifier")
-                # Try to construct a PDF URL
-                pdf_url = f"https://archive.org/download/{identifier}/{identifier}.pdf"
-                # Check if it exists
-                head = requests.head(pdf_url, timeout=10)
-                if head.status_code == 200:
-                    return pdf_url
+                # Construct the conventional PDF URL for the item
+                pdf_urls.append(f"https://archive.org/download/{identifier}/{identifier}.pdf")
     except Exception as e:
         print(f"Error searching Internet Archive for '{query}': {e}")
-    return None
+    return tuple(pdf_urls)
 
-def main():
-    not_found_rows = []
-    with open(CSV_FILE, newline='', encoding='utf-8') as csvfile, \
-         open(LOG_FILE, 'w', newline='', encoding='utf-8') as logfile:
-        reader = csv.DictReader(csvfile)
-        fieldnames = reader.fieldnames + ["wayback_url", "pdf_downloaded", "attempts", "not_found_reason"]
-        writer = csv.DictWriter(logfile, fieldnames=fieldnames)
-        writer.writeheader()
+def list_downloaded_bibcodes() -> Set[str]:
+    """
+    List the bibcodes that already have a PDF in PDF_DIR, reading the directory once.
+    """
+    with os.scandir(PDF_DIR) as entries:
+        return {e.name[:-4] for e in entries if e.name.endswith('.pdf')}
+
+async def process_row(session: aiohttp.ClientSession, row: dict,
+                      existing: Set[str]) -> Tuple[dict, Optional[dict]]:
+    """
+    Try to retrieve the PDF for one metadata row.
+    `existing` holds the bibcodes already downloaded (see list_downloaded_bibcodes).
+    Returns the row annotated for the log file, and a not-found entry (or None if the PDF was retrieved).
+    """
+    url = row.get("url", "")
+    bibcode = row.get("bibcode", "")
+    title = row.get("title", "")
+    out_path = Path(PDF_DIR) / f"{bibcode or 'unknown'}.pdf"
+    attempts = []
+    pdf_downloaded = False
+    reasons = []
 
-        for row in reader:
-            url = row.get("url", "")
-            bibcode = row.get("bibcode", "")
-            title = row.get("title", "")
-            out_path = Path(PDF_DIR) / f"{bibcode or 'unknown'}.pdf"
-            attempts = []
-            pdf_downloaded = False
-            not_found_reason = ""
-
-            # Skip if already downloaded
-            if out_path.exists():
-                attempts.append("Already downloaded")
+    # Skip if already downloaded
+    if (bibcode or 'unknown') in existing:
+        attempts.append("Already downloaded")
+        pdf_downloaded = True
+        row["wayback_url"] = ""
+        row["pdf_downloaded"] = "True"
+        row["attempts"] = "; ".join(attempts)
+        row["not_found_reason"] = ""
+        print(f"{bibcode}: Already downloaded, skipping.")
+        return row, None
+
+    # 1. Try all Wayback snapshots for original URL
+    snapshots = await get_all_wayback_snapshots(session, url)
+    for snap_url in snapshots:
+        attempts.append(f"Wayback snapshot: {snap_url}")
+        success, reason = await download_pdf(session, snap_url, out_path)
+        if success:
+            pdf_downloaded = True
+            row["wayback_url"] = snap_url
+            row["pdf_downloaded"] = "True"
+            row["attempts"] = "; ".join(attempts)
+            row["not_found_reason"] = ""
+            print(f"{bibcode}: PDF downloaded from Wayback snapshot.")
+            return row, None
+        else:
+            reasons.append(f"Wayback snapshot not PDF: {reason}")
+    if not snapshots:
+        attempts.append("No Wayback snapshots found")
+        reasons.append("No Wayback snapshots found")
+
+    # 2. Try all Wayback snapshots for .pdf variant
+    if not pdf_downloaded and not url.lower().endswith('.pdf'):
+        pdf_url = url.rstrip('/') + '.pdf'
+        pdf_snapshots = await get_all_wayback_snapshots(session, pdf_url)
+        for snap_url in pdf_snapshots:
+            attempts.append(f"Wayback snapshot (.pdf): {snap_url}")
+            success, reason = await download_pdf(session, snap_url, out_path)
+            if success:
                 pdf_downloaded = True
-                row["wayback_url"] = ""
+                row["wayback_url"] = snap_url
                 row["pdf_downloaded"] = "True"
                 row["attempts"] = "; ".join(attempts)
                 row["not_found_reason"] = ""
-                writer.writerow(row)
-                print(f"{bibcode}: Already downloaded, skipping.")
-                continue
+                print(f"{bibcode}: PDF downloaded from Wayback snapshot (.pdf).")
+                return row, None
+            else:
+                reasons.append(f"Wayback .pdf not PDF: {reason}")
+        if not pdf_snapshots:
+            attempts.append("No Wayback .pdf snapshots found")
+            reasons.append("No Wayback .pdf snapshots found")
 
-            # 1. Try all Wayback snapshots for original URL
-            snapshots = get_all_wayback_snapshots(url)
-            for snap_url in snapshots:
-                attempts.append(f"Wayback snapshot: {snap_url}")
-                success, reason = download_pdf(snap_url, out_path)
-                if success:
-                    pdf_downloaded = True
-                    row["wayback_url"] = snap_url
-                    row["pdf_downloaded"] = "True"
-                    row["attempts"] = "; ".join(attempts)
-                    row["not_found_reason"] = ""
-                    writer.writerow(row)
-                    print(f"{bibcode}: PDF downloaded from Wayback snapshot.")
-                    break
-                else:
-                    not_found_reason = f"Wayback snapshot not PDF: {reason}"
-            if pdf_downloaded:
+    # 3. Try original URL directly
+    if not pdf_downloaded:
+        attempts.append("Tried original URL directly")
+        success, reason = await download_pdf(session, url, out_path)
+        if success:
+            pdf_downloaded = True
+            row["wayback_url"] = ""
+            row["pdf_downloaded"] = "True"
+            row["attempts"] = "; ".join(attempts)
+            row["not_found_reason"] = ""
+            print(f"{bibcode}: PDF downloaded from original URL.")
+            return row, None
+        else:
+            reasons.append(f"Original URL not PDF: {reason}")
+
+    # 4. Search Internet Archive by bibcode and title
+    if not pdf_downloaded:
+        for query in [bibcode, title]:
+            if not query:
                 continue
-            if not snapshots:
-                attempts.append("No Wayback snapshots found")
-                not_found_reason = "No Wayback snapshots found"
-
-            # 2. Try all Wayback snapshots for .pdf variant
-            if not pdf_downloaded and not url.lower().endswith('.pdf'):
-                pdf_url = url.rstrip('/') + '.pdf'
-                pdf_snapshots = get_all_wayback_snapshots(pdf_url)
-                for snap_url in pdf_snapshots:
-                    attempts.append(f"Wayback snapshot (.pdf): {snap_url}")
-                    success, reason = download_pdf(snap_url, out_path)
-                    if success:
-                        pdf_downloaded = True
-                        row["wayback_url"] = snap_url
-                        row["pdf_downloaded"] = "True"
-                        row["attempts"] = "; ".join(attempts)
-                        row["not_found_reason"] = ""
-                        writer.writerow(row)
-                        print(f"{bibcode}: PDF downloaded from Wayback snapshot (.pdf).")
-                        break
-                    else:
-                        not_found_reason += f"; Wayback .pdf not PDF: {reason}"
-                if pdf_downloaded:
-                    continue
-                if not pdf_snapshots:
-                    attempts.append("No Wayback .pdf snapshots found")
-                    not_found_reason += "; No Wayback .pdf snapshots found"
-
-            # 3. Try original URL directly
-            if not pdf_downloaded:
-                attempts.append("Tried original URL directly")
-                success, reason = download_pdf(url, out_path)
+            attempts.append(f"Searched IA for '{query}'")
+            for ia_pdf_url in await search_internet_archive(session, query):
+                success, reason = await download_pdf(session, ia_pdf_url, out_path)
                 if success:
                     pdf_downloaded = True
-                    row["wayback_url"] = ""
+                    row["wayback_url"] = ia_pdf_url
                     row["pdf_downloaded"] = "True"
                     row["attempts"] = "; ".join(attempts)
                     row["not_found_reason"] = ""
-                    writer.writerow(row)
-                    print(f"{bibcode}: PDF downloaded from original URL.")
-                    continue
+                    print(f"{bibcode}: PDF downloaded from Internet Archive search.")
+                    return row, None
                 else:
-                    not_found_reason += f"; Original URL not PDF: {reason}"
-
-            # 4. Search Internet Archive by bibcode and title
-            if not pdf_downloaded:
-                for query in [bibcode, title]:
-                    if not query:
-                        continue
-                    attempts.append(f"Searched IA for '{query}'")
-                    ia_pdf_url = search_internet_archive(query)
-                    if ia_pdf_url:
-                        success, reason = download_pdf(ia_pdf_url, out_path)
-                        if success:
-                            pdf_downloaded = True
-                            row["wayback_url"] = ia_pdf_url
-                            row["pdf_downloaded"] = "True"
-                            row["attempts"] = "; ".join(attempts)
-                            row["not_found_reason"] = ""
-                            writer.writerow(row)
-                            print(f"{bibcode}: PDF downloaded from Internet Archive search.")
-                            break
-                        else:
-                            not_found_reason += f"; IA search not PDF: {reason}"
-                if pdf_downloaded:
-                    continue
-                not_found_reason += "; No PDF found in IA search"
-
-            # If not found, log to not_found_pdfs.csv
-            if not pdf_downloaded:
-                row["wayback_url"] = ""
-                row["pdf_downloaded"] = "False"
-                row["attempts"] = "; ".join(attempts)
-                row["not_found_reason"] = not_found_reason.strip('; ')
-                writer.writerow(row)
-                not_found_rows.append({
-                    "bibcode": bibcode,
-                    "url": url,
-                    "reason": not_found_reason.strip('; ')
-                })
-                print(f"{bibcode}: PDF not found. {not_found_reason.strip('; ')}")
+                    reasons.append(f"IA search not PDF: {reason}")
+        reasons.append("No PDF found in IA search")
+
+    # Not found, log to not_found_pdfs.csv
+    row["wayback_url"] = ""
+    row["pdf_downloaded"] = "False"
+    row["attempts"] = "; ".join(attempts)
+    not_found_reason = "; ".join(reasons)
+    row["not_found_reason"] = not_found_reason
+    print(f"{bibcode}: PDF not found. {not_found_reason}")
+    return row, {
+        "bibcode": bibcode,
+        "url": url,
+        "reason": not_found_reason
+    }
+
+def interleave_by_host(rows: List[dict]) -> List[int]:
+    """
+    Order row indices round-robin by URL host, so consecutive requests go to
+    different origins instead of bursting at one host. Within a host, rows
+    keep their input order.
+    """
+    by_host: Dict[str, List[int]] = {}
+    for i, row in enumerate(rows):
+        by_host.setdefault(urlparse(row.get("url", "")).netloc, []).append(i)
+    return [i for i in chain.from_iterable(zip_longest(*by_host.values())) if i is not None]
+
+async def retrieve_all(rows: List[dict], existing: Set[str], writer: csv.DictWriter) -> List[dict]:
+    """
+    Retrieve PDFs for all rows concurrently, writing log rows in input order as they finish.
+    Returns the not-found entries.
+    """
+    not_found_rows = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    # One lock per output file (bibcode), claimed before the row starts
+    claims: Dict[str, asyncio.Lock] = {}
+    connector = aiohttp.TCPConnector(limit=CONCURRENCY, limit_per_host=PER_HOST_LIMIT)
+    async with aiohttp.ClientSession(connector=connector, headers={"User-Agent": USER_AGENT}) as session:
+
+        async def bounded(row: dict) -> Tuple[dict, Optional[dict]]:
+            key = row.get("bibcode") or 'unknown'
+            # Rows sharing an output file run one after another, so a duplicate
+            # sees the earlier download in `existing` instead of fetching again
+            async with claims.setdefault(key, asyncio.Lock()):
+                async with semaphore:
+                    result = await process_row(session, row, existing)
+                if result[0]["pdf_downloaded"] == "True":
+                    existing.add(key)
+                return result
+
+        # Start rows interleaved by host; the semaphore admits them in that order
+        tasks: List[Optional[asyncio.Future]] = [None] * len(rows)
+        for i in interleave_by_host(rows):
+            tasks[i] = asyncio.ensure_future(bounded(rows[i]))
+        buffered = []
+        # All tasks run concurrently; awaiting them in order keeps the log in input order
+        for task in tasks:
+            row, not_found = await task
+            buffered.append(row)
+            if len(buffered) >= LOG_BATCH_SIZE:
+                writer.writerows(buffered)
+                buffered.clear()
+            if not_found:
+                not_found_rows.append(not_found)
+        writer.writerows(buffered)
+    return not_found_rows
+
+def main():
+    with open(CSV_FILE, newline='', encoding='utf-8') as csvfile, \
+         open(LOG_FILE, 'w', newline='', encoding='utf-8', buffering=1 << 20) as logfile:
+        reader = csv.DictReader(csvfile)
+        fieldnames = reader.fieldnames + ["wayback_url", "pdf_downloaded", "attempts", "not_found_reason"]
+        writer = csv.DictWriter(logfile, fieldnames=fieldnames)
+        writer.writeheader()
+        rows = list(reader)
+        existing = list_downloaded_bibcodes()
+        not_found_rows = asyncio.run(retrieve_all(rows, existing, writer))
 
     # Write not found list
     if not_found_rows:
         with open(NOT_FOUND_FILE, 'w', newline='', encoding='utf-8') as nf:
             nf_writer = csv.DictWriter(nf, fieldnames=["bibcode", "url", "reason"])
             nf_writer.writeheader()
-            for row in not_found_rows:
-                nf_writer.writerow(row)
+            nf_writer.writerows(not_found_rows)
 
 if __name__ == "__main__":
     main()